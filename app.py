@@ -1,14 +1,26 @@
 # app.py - UPDATED IMPORTS
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, stream_template, get_flashed_messages
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from functools import lru_cache
 from wtforms import StringField, SubmitField, SelectField, DateField, TextAreaField, IntegerField, PasswordField, TelField, EmailField
 from flask_wtf import FlaskForm
 from wtforms.validators import DataRequired, Optional, Email, Length, NumberRange, EqualTo
 from flask_mail import Mail, Message
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.exc import IntegrityError
+import click
+import multiprocessing
 import os
+import queue
+import socket
+import threading
+import time
+import uuid
 
 class EventSearchForm(FlaskForm):
     query = StringField('Search Events', validators=[Optional()])
@@ -93,23 +105,87 @@ login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access this page.'
 
+# Password hashing configuration
+# Changing PASSWORD_HASH_METHOD or PASSWORD_SALT_LENGTH takes effect for
+# existing users on their next login (see User.needs_rehash()).
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+app.config['PASSWORD_SALT_LENGTH'] = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+# With AUTH_HASH_POOL_SIZE > 0, hashing runs in that many worker processes so
+# a login spike can't starve page serving of CPU; at most
+# AUTH_HASH_MAX_PENDING hashes may be queued or running at once.
+app.config['AUTH_HASH_POOL_SIZE'] = int(os.environ.get('AUTH_HASH_POOL_SIZE', 0))
+app.config['AUTH_HASH_MAX_PENDING'] = int(os.environ.get('AUTH_HASH_MAX_PENDING', 32))
+app.config['AUTH_HASH_TIMEOUT'] = float(os.environ.get('AUTH_HASH_TIMEOUT', 10))
+
+class PasswordHashBusy(Exception):
+    """Raised when the hash pool is saturated or too slow to answer."""
+
+auth_hash_pool = None
+auth_hash_slots = threading.BoundedSemaphore(app.config['AUTH_HASH_MAX_PENDING'])
+
+if app.config['AUTH_HASH_POOL_SIZE'] > 0:
+    # Fork the workers now, before the app opens DB connections or starts
+    # threads, so they inherit a clean process
+    auth_hash_pool = ProcessPoolExecutor(
+        max_workers=app.config['AUTH_HASH_POOL_SIZE'],
+        mp_context=multiprocessing.get_context('fork')
+    )
+    auth_hash_pool.submit(abs, 0).result()
+
+def run_password_hash(func, *args, **kwargs):
+    if auth_hash_pool is None:
+        return func(*args, **kwargs)
+
+    if not auth_hash_slots.acquire(blocking=False):
+        raise PasswordHashBusy('Too many password checks in progress')
+    try:
+        future = auth_hash_pool.submit(func, *args, **kwargs)
+    except Exception:
+        auth_hash_slots.release()
+        raise
+    # Free the slot when the hash actually finishes (or is cancelled), not
+    # when the request gives up, so the cap counts real in-flight work
+    future.add_done_callback(lambda f: auth_hash_slots.release())
+
+    try:
+        return future.result(timeout=app.config['AUTH_HASH_TIMEOUT'])
+    except FuturesTimeoutError:
+        future.cancel()  # Only succeeds if no worker has picked it up yet
+        raise PasswordHashBusy('Password check timed out')
+
+@lru_cache(maxsize=8)
+def password_hash_prefix(method):
+    """The method prefix werkzeug writes for `method`, e.g. 'pbkdf2:sha256:600000'."""
+    return generate_password_hash('', method=method, salt_length=1).split('$', 1)[0]
+
 # User model
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))  # scrypt hashes exceed 128 chars
     role = db.Column(db.String(20), nullable=False, default='attendee')
     phone = db.Column(db.String(20))
     whatsapp = db.Column(db.String(20))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
+        self.password_hash = run_password_hash(
+            generate_password_hash, password,
+            method=app.config['PASSWORD_HASH_METHOD'],
+            salt_length=app.config['PASSWORD_SALT_LENGTH']
+        )
+
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
-    
+        return run_password_hash(check_password_hash, self.password_hash, password)
+
+    def needs_rehash(self):
+        """True if the stored hash was made with different hash parameters"""
+        method, _, rest = self.password_hash.partition('$')
+        salt = rest.partition('$')[0]
+        return (method != password_hash_prefix(app.config['PASSWORD_HASH_METHOD'])
+                or len(salt) != app.config['PASSWORD_SALT_LENGTH'])
+
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -160,6 +236,72 @@ class Registration(db.Model):
     def __repr__(self):
         return f'<Registration {self.attendee_id} for {self.event_id}>'
 
+# Archive (cold) tables - past and deleted events are moved here so the live
+# Event/Registration tables only hold current data
+class ArchivedEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, nullable=False, index=True)  # Original Event.id
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    tags = db.Column(db.String(500))
+    date = db.Column(db.String(50), nullable=False)
+    time = db.Column(db.String(50), nullable=False)
+    venue = db.Column(db.String(200), nullable=False)
+    capacity = db.Column(db.Integer, default=0)
+    organizer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    contact_phone = db.Column(db.String(20))
+    contact_whatsapp = db.Column(db.String(20))
+    contact_email = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    archive_reason = db.Column(db.String(20), default='past')  # 'past' or 'deleted'
+
+    organizer = db.relationship('User')
+
+    def get_tags_list(self):
+        """Convert comma-separated tags to list"""
+        if self.tags:
+            return [tag.strip() for tag in self.tags.split(',')]
+        return []
+
+    def __repr__(self):
+        return f'<ArchivedEvent {self.title}>'
+
+class ArchivedRegistration(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    # Event.id values can be reused once an event leaves the live table, so
+    # registrations point at their own archive row rather than event_id
+    archived_event_id = db.Column(db.Integer, db.ForeignKey('archived_event.id'), nullable=False, index=True)
+    event_id = db.Column(db.Integer, nullable=False, index=True)  # Original Event.id
+    attendee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    registered_at = db.Column(db.DateTime)
+    status = db.Column(db.String(20))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    attendee = db.relationship('User')
+    archived_event = db.relationship('ArchivedEvent', backref='archived_registrations')
+
+    def __repr__(self):
+        return f'<ArchivedRegistration {self.attendee_id} for {self.event_id}>'
+
+# Scheduled background job state - one row per job; the lease columns make
+# sure only one worker runs a job at a time
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+    interval_seconds = db.Column(db.Integer, nullable=False)
+    next_run_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_run_at = db.Column(db.DateTime)
+    last_status = db.Column(db.String(20))  # 'success' or 'failed'
+    last_result = db.Column(db.Text)
+    cursor = db.Column(db.String(200))  # Job-specific progress marker
+    lease_owner = db.Column(db.String(200))
+    lease_expires_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<Job {self.name}>'
+
 # This function is required by Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
@@ -229,6 +371,596 @@ def send_event_created_notification(organizer, event):
     
     return send_email(organizer.email, subject, template)
 
+def send_event_reminder(user, event):
+    subject = f"Reminder: {event.title} is tomorrow"
+    template = f"""
+    <h2>See You Tomorrow!</h2>
+    <p>Hello {user.username},</p>
+    <p>This is a reminder that you are registered for:</p>
+
+    <div style="background: #f8f9fa; padding: 1rem; border-radius: 5px; margin: 1rem 0;">
+        <h3>{event.title}</h3>
+        <p><strong>Date:</strong> {event.date}</p>
+        <p><strong>Time:</strong> {event.time}</p>
+        <p><strong>Venue:</strong> {event.venue}</p>
+    </div>
+
+    <p><small>Questions? Contact the organizer at {event.contact_email or event.organizer.email}</small></p>
+    """
+
+    return send_email(user.email, subject, template)
+
+# Archival utility functions
+app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+
+def archive_events(event_ids, reason='past'):
+    """Move the given events and their registrations into the archive tables.
+
+    Rows are copied with INSERT ... SELECT and removed from the live tables in
+    the same transaction, so an event is never in both places or neither.
+    """
+    if not event_ids:
+        return 0
+
+    now = datetime.utcnow()
+    event_columns = ['title', 'description', 'category', 'tags', 'date', 'time',
+                     'venue', 'capacity', 'organizer_id', 'contact_phone',
+                     'contact_whatsapp', 'contact_email', 'created_at']
+    registration_columns = ['attendee_id', 'registered_at', 'status']
+
+    try:
+        # Archive rows created below get ids above this one, which tells the
+        # new copy of an event apart from earlier copies with the same event_id
+        last_archived_id = db.session.scalar(db.select(db.func.max(ArchivedEvent.id))) or 0
+        db.session.execute(
+            db.insert(ArchivedEvent).from_select(
+                ['event_id'] + event_columns + ['archived_at', 'archive_reason'],
+                db.select(Event.id, *[getattr(Event, c) for c in event_columns],
+                          db.literal(now), db.literal(reason))
+                .where(Event.id.in_(event_ids))
+            )
+        )
+        db.session.execute(
+            db.insert(ArchivedRegistration).from_select(
+                ['archived_event_id', 'event_id'] + registration_columns + ['archived_at'],
+                db.select(ArchivedEvent.id, Registration.event_id,
+                          *[getattr(Registration, c) for c in registration_columns],
+                          db.literal(now))
+                .join(ArchivedEvent, db.and_(
+                    ArchivedEvent.event_id == Registration.event_id,
+                    ArchivedEvent.id > last_archived_id
+                ))
+                .where(Registration.event_id.in_(event_ids))
+            )
+        )
+        db.session.execute(
+            db.delete(Registration).where(Registration.event_id.in_(event_ids))
+        )
+        db.session.execute(
+            db.delete(Event).where(Event.id.in_(event_ids))
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(event_ids)
+
+def parse_event_date(value):
+    """Parse an Event.date string in ISO format; None if it isn't one"""
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+    except (AttributeError, ValueError):
+        return None
+
+def archive_past_events(before=None, batch_size=None, on_batch=None):
+    """Archive events dated before `before` (default: today) in batches.
+
+    Event.date is free text, so the string comparison only narrows the
+    candidates; each date is parsed in Python and events whose date doesn't
+    parse (e.g. '12/25/2099') are left alone. Each batch is its own
+    transaction so a large backlog never holds a long write lock on the live
+    tables. `on_batch` is called before each batch (the job runner uses it
+    to renew its lease). Returns the number of events archived.
+    """
+    before = before or datetime.utcnow().date()
+    batch_size = batch_size or app.config['ARCHIVE_BATCH_SIZE']
+    archived = 0
+    last_id = 0
+
+    while True:
+        if on_batch:
+            on_batch()
+        candidates = db.session.execute(
+            db.select(Event.id, Event.date)
+            .where(Event.id > last_id, Event.date < before.isoformat())
+            .order_by(Event.id)
+            .limit(batch_size)
+        ).all()
+        if not candidates:
+            break
+        last_id = candidates[-1].id
+
+        event_ids = []
+        for event_id, event_date in candidates:
+            parsed = parse_event_date(event_date)
+            if parsed is not None and parsed < before:
+                event_ids.append(event_id)
+        archived += archive_events(event_ids, reason='past')
+
+    return archived
+
+# Queued registration (high-concurrency mode)
+# 'sync' registers inside the request; 'queued' hands requests to a single
+# consumer thread per event that admits them in batches against capacity.
+# Queued mode assumes a single app process (see Procfile).
+app.config['REGISTRATION_MODE'] = os.environ.get('REGISTRATION_MODE', 'sync')
+app.config['REGISTRATION_BATCH_SIZE'] = int(os.environ.get('REGISTRATION_BATCH_SIZE', 200))
+# Upper bound on events with a live consumer thread at the same time
+app.config['REGISTRATION_MAX_CONSUMERS'] = int(os.environ.get('REGISTRATION_MAX_CONSUMERS', 64))
+app.config['REGISTRATION_WAIT_SECONDS'] = float(os.environ.get('REGISTRATION_WAIT_SECONDS', 2))
+
+REGISTRATION_OUTCOMES = {
+    'pending': ('Your registration is being processed. Check back in a moment.', 'info'),
+    'confirmed': ('Successfully registered for the event! Check your email for confirmation.', 'success'),
+    'already_registered': ('You are already registered for this event.', 'info'),
+    'organizer': ('You are the organizer of this event - no need to register!', 'warning'),
+    'full': ('Sorry, this event is full!', 'error'),
+    'not_found': ('This event is no longer available.', 'error'),
+    'error': ('Registration failed. Please try again.', 'error'),
+    'busy': ('Registrations are very busy right now. Please try again in a moment.', 'error'),
+}
+
+class RegistrationQueueFull(Exception):
+    """Raised when starting another consumer would exceed max_consumers."""
+
+
+class RegistrationTicket:
+    """A queued registration request; `status` moves from 'pending' to an outcome."""
+
+    def __init__(self, event_id, attendee_id):
+        self.id = uuid.uuid4().hex
+        self.event_id = event_id
+        self.attendee_id = attendee_id
+        self.status = 'pending'
+        self.done = threading.Event()
+
+    def resolve(self, status):
+        self.status = status
+        self.done.set()
+
+    def to_dict(self):
+        return {'ticket': self.id, 'event_id': self.event_id, 'status': self.status}
+
+class RegistrationQueue:
+    """Admission queue with one consumer thread per event.
+
+    Because only one thread ever writes registrations for a given event, the
+    capacity check and the inserts for a whole batch happen in one transaction
+    without racing other requests - no overbooking and one commit per batch.
+    """
+
+    def __init__(self, flask_app, batch_size=200, idle_timeout=30, max_tickets=50000, max_consumers=64):
+        self.app = flask_app
+        self.batch_size = batch_size
+        self.max_consumers = max_consumers
+        self.idle_timeout = idle_timeout
+        self.max_tickets = max_tickets
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._tickets = OrderedDict()
+        self._mailer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='registration-mail')
+
+    def submit(self, event_id, attendee_id):
+        ticket = RegistrationTicket(event_id, attendee_id)
+        with self._lock:
+            pending = self._queues.get(event_id)
+            if pending is None:
+                if len(self._queues) >= self.max_consumers:
+                    raise RegistrationQueueFull(f'{len(self._queues)} events already have consumers')
+                pending = self._queues[event_id] = queue.Queue()
+                threading.Thread(target=self._consume, args=(event_id, pending),
+                                 name=f'registration-{event_id}', daemon=True).start()
+            self._tickets[ticket.id] = ticket
+            while len(self._tickets) > self.max_tickets:
+                self._tickets.popitem(last=False)
+            pending.put(ticket)
+        return ticket
+
+    def get_ticket(self, ticket_id):
+        with self._lock:
+            return self._tickets.get(ticket_id)
+
+    def _consume(self, event_id, pending):
+        while True:
+            try:
+                batch = [pending.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                with self._lock:
+                    # Retire the consumer only if nothing arrived meanwhile
+                    if pending.empty():
+                        del self._queues[event_id]
+                        return
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            with self.app.app_context():
+                try:
+                    self._process_batch(event_id, batch)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error processing registrations for event {event_id}: {e}")
+                    for ticket in batch:
+                        if ticket.status == 'pending':
+                            ticket.resolve('error')
+                finally:
+                    db.session.remove()
+
+    def _process_batch(self, event_id, batch):
+        event = db.session.get(Event, event_id)
+        if event is None:
+            for ticket in batch:
+                ticket.resolve('not_found')
+            return
+
+        attendee_ids = {ticket.attendee_id for ticket in batch}
+        registered = set(db.session.scalars(
+            db.select(Registration.attendee_id).where(
+                Registration.event_id == event_id,
+                Registration.attendee_id.in_(attendee_ids)
+            )
+        ))
+        current_registrations = Registration.query.filter_by(event_id=event_id).count()
+
+        outcomes = []
+        for ticket in batch:
+            if ticket.attendee_id == event.organizer_id:
+                outcome = 'organizer'
+            elif ticket.attendee_id in registered:
+                outcome = 'already_registered'
+            elif event.capacity > 0 and current_registrations >= event.capacity:
+                outcome = 'full'
+            else:
+                db.session.add(Registration(event_id=event_id, attendee_id=ticket.attendee_id))
+                registered.add(ticket.attendee_id)
+                current_registrations += 1
+                outcome = 'confirmed'
+            outcomes.append((ticket, outcome))
+
+        db.session.commit()
+
+        for ticket, outcome in outcomes:
+            ticket.resolve(outcome)
+            if outcome == 'confirmed':
+                self._mailer.submit(self._send_confirmation, ticket.attendee_id, event_id)
+
+    def _send_confirmation(self, attendee_id, event_id):
+        # SMTP runs off the consumer thread so it never delays admission
+        with self.app.app_context():
+            try:
+                user = db.session.get(User, attendee_id)
+                event = db.session.get(Event, event_id)
+                if user and event:
+                    send_registration_confirmation(user, event)
+            finally:
+                db.session.remove()
+
+registration_queue = RegistrationQueue(app, batch_size=app.config['REGISTRATION_BATCH_SIZE'],
+                                       max_consumers=app.config['REGISTRATION_MAX_CONSUMERS'])
+
+# Template rendering
+app.config['TEMPLATE_CACHE_DIR'] = os.environ.get(
+    'TEMPLATE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+app.config['TEMPLATE_STREAM_THRESHOLD'] = int(os.environ.get('TEMPLATE_STREAM_THRESHOLD', 200))
+
+def precompile_templates():
+    """Compile every template once at startup and keep the bytecode on disk,
+    so neither the first request nor a restarted worker pays for parsing."""
+    os.makedirs(app.config['TEMPLATE_CACHE_DIR'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['TEMPLATE_CACHE_DIR'])
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+def present_events(events, summary_length=120):
+    """Build the view-model for a list of event cards.
+
+    Registration counts and organizer names are fetched with one grouped
+    query each instead of per card inside the template loop.
+    """
+    event_ids = [event.id for event in events]
+    organizer_ids = {event.organizer_id for event in events}
+
+    registration_counts = {}
+    organizer_names = {}
+    if event_ids:
+        registration_counts = dict(db.session.execute(
+            db.select(Registration.event_id, db.func.count(Registration.id))
+            .where(Registration.event_id.in_(event_ids))
+            .group_by(Registration.event_id)
+        ).all())
+        organizer_names = dict(db.session.execute(
+            db.select(User.id, User.username).where(User.id.in_(organizer_ids))
+        ).all())
+
+    cards = []
+    for event in events:
+        registrations = registration_counts.get(event.id, 0)
+        percentage = 0
+        if event.capacity > 0:
+            percentage = int(round(registrations / event.capacity * 100))
+
+        if percentage >= 90:
+            progress_class = 'bg-danger'
+        elif percentage >= 70:
+            progress_class = 'bg-warning'
+        else:
+            progress_class = 'bg-success'
+
+        cards.append({
+            'id': event.id,
+            'title': event.title,
+            'category': event.category.title(),
+            'summary': event.description[:summary_length],
+            'date': event.date,
+            'time': event.time,
+            'venue': event.venue,
+            'organizer': organizer_names.get(event.organizer_id, ''),
+            'capacity': event.capacity,
+            'registrations': registrations,
+            'percentage': percentage,
+            'progress_class': progress_class,
+            'created': event.created_at.strftime('%b %d') if event.created_at else '',
+        })
+    return cards
+
+def render_event_list(template_name, events, **context):
+    """Render a list page, streaming it once the list is long enough that
+    sending the head of the page early matters."""
+    if len(events) > app.config['TEMPLATE_STREAM_THRESHOLD']:
+        # The session cookie goes out before a streamed body renders, so pop
+        # the flashes now and hand them to the layout instead
+        flashed_messages = get_flashed_messages(with_categories=True)
+        return stream_template(template_name, events=events,
+                               flashed_messages=flashed_messages, **context)
+    return render_template(template_name, events=events, **context)
+
+precompile_templates()
+
+# Background jobs
+# Periodic work runs here instead of on the request path. Run due jobs with
+# `flask jobs run-due` from cron, `flask jobs worker` as a separate process,
+# or set JOB_SCHEDULER_ENABLED to poll from a thread inside the app.
+app.config['JOB_SCHEDULER_ENABLED'] = os.environ.get('JOB_SCHEDULER_ENABLED', '').lower() in ('1', 'true', 'yes')
+app.config['JOB_POLL_SECONDS'] = int(os.environ.get('JOB_POLL_SECONDS', 60))
+app.config['JOB_LEASE_SECONDS'] = int(os.environ.get('JOB_LEASE_SECONDS', 600))
+app.config['JOB_BATCH_SIZE'] = int(os.environ.get('JOB_BATCH_SIZE', 500))
+
+JOBS = {}
+
+def scheduled_job(name, interval):
+    """Register a function as a periodic job that runs every `interval`.
+
+    The function receives a JobRun and returns a short summary that is
+    stored in `Job.last_result`. Long jobs must call `run.renew()` between
+    batches to keep their lease.
+    """
+    def decorator(func):
+        JOBS[name] = (func, interval)
+        return func
+    return decorator
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+def iter_batches(query, batch_size=None, after_id=0):
+    """Yield lists of rows ordered by id, one batch at a time.
+
+    Uses keyset pagination (id > last seen id) so each batch is an index
+    range scan and rows deleted by earlier batches don't shift the window.
+    """
+    batch_size = batch_size or app.config['JOB_BATCH_SIZE']
+    model = query.column_descriptions[0]['entity']
+    last_id = after_id
+    while True:
+        batch = query.filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+        if not batch:
+            break
+        yield batch
+        last_id = batch[-1].id
+
+def sync_jobs():
+    """Make sure every registered job has a row in the job table."""
+    existing = set(db.session.scalars(db.select(Job.name)))
+    for name, (func, interval) in JOBS.items():
+        if name not in existing:
+            db.session.add(Job(name=name, interval_seconds=int(interval.total_seconds()),
+                               next_run_at=datetime.utcnow()))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker inserted the same rows first
+        db.session.rollback()
+
+def acquire_lease(name, owner, force=False):
+    """Atomically claim a job; returns True if this worker now holds the lease."""
+    now = datetime.utcnow()
+    conditions = [
+        Job.name == name,
+        db.or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < now)
+    ]
+    if not force:
+        conditions.append(Job.next_run_at <= now)
+
+    result = db.session.execute(
+        db.update(Job).where(*conditions).values(
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=app.config['JOB_LEASE_SECONDS'])
+        )
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+class LeaseLost(Exception):
+    """Raised when another worker has taken over a running job's lease."""
+
+class JobRun:
+    """One execution of a job by the worker holding its lease."""
+
+    def __init__(self, name, owner, cursor):
+        self.name = name
+        self.owner = owner
+        self.cursor = cursor
+
+    def renew(self, cursor=None):
+        """Commit the work done so far, extend the lease and optionally save
+        a new cursor. Raises LeaseLost if this worker no longer owns the job."""
+        values = {
+            'lease_expires_at': datetime.utcnow() + timedelta(seconds=app.config['JOB_LEASE_SECONDS'])
+        }
+        if cursor is not None:
+            self.cursor = values['cursor'] = cursor
+
+        result = db.session.execute(
+            db.update(Job).where(Job.name == self.name, Job.lease_owner == self.owner).values(**values)
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            raise LeaseLost(f'{self.owner} lost the lease on {self.name}')
+        db.session.commit()
+
+def run_job(name, force=False):
+    """Run one job if it is due and not leased elsewhere.
+
+    Returns the job's summary, or None if it was skipped.
+    """
+    func, interval = JOBS[name]
+    owner = worker_id()
+    if not acquire_lease(name, owner, force=force):
+        return None
+
+    run = JobRun(name, owner, db.session.scalar(db.select(Job.cursor).where(Job.name == name)))
+    try:
+        result = func(run)
+        status, summary = 'success', str(result)
+    except LeaseLost as e:
+        # Whoever holds the lease now owns the job row; leave it alone
+        db.session.rollback()
+        print(f"Job {name} stopped: {e}")
+        return None
+    except Exception as e:
+        db.session.rollback()
+        status, summary = 'failed', str(e)
+        result = None
+        print(f"Job {name} failed: {e}")
+
+    now = datetime.utcnow()
+    finished = db.session.execute(
+        db.update(Job).where(Job.name == name, Job.lease_owner == owner).values(
+            cursor=run.cursor,
+            last_run_at=now,
+            next_run_at=now + interval,
+            last_status=status,
+            last_result=summary,
+            lease_owner=None,
+            lease_expires_at=None
+        )
+    )
+    if finished.rowcount != 1:
+        db.session.rollback()
+        print(f"Job {name} finished after losing its lease; result discarded")
+        return None
+    db.session.commit()
+    return result
+
+def run_due_jobs():
+    """Run every job that is due; returns {name: summary} for those that ran."""
+    sync_jobs()
+    ran = {}
+    for name in JOBS:
+        result = run_job(name)
+        if result is not None:
+            ran[name] = result
+    return ran
+
+def job_scheduler_loop():
+    while True:
+        with app.app_context():
+            try:
+                run_due_jobs()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Job scheduler error: {e}")
+            finally:
+                db.session.remove()
+        time.sleep(app.config['JOB_POLL_SECONDS'])
+
+def start_job_scheduler():
+    threading.Thread(target=job_scheduler_loop, name='job-scheduler', daemon=True).start()
+
+@scheduled_job('event-reminders', interval=timedelta(hours=1))
+def send_event_reminders(run):
+    """Email attendees of tomorrow's events, once per day.
+
+    The cursor is 'YYYY-MM-DD' once a day is done, or 'YYYY-MM-DD:<id>' with
+    the last registration reminded, so a run taken over by another worker
+    resumes instead of resending.
+    """
+    tomorrow = (datetime.utcnow().date() + timedelta(days=1)).isoformat()
+    if run.cursor == tomorrow:
+        return 'already sent'
+
+    after_id = 0
+    if run.cursor and run.cursor.startswith(f'{tomorrow}:'):
+        after_id = int(run.cursor.split(':', 1)[1])
+
+    registrations = Registration.query.join(Event).filter(
+        Event.date == tomorrow
+    ).options(db.joinedload(Registration.attendee), db.joinedload(Registration.event))
+
+    sent = 0
+    # SMTP is slow; small batches keep each one well inside the lease
+    for batch in iter_batches(registrations, batch_size=100, after_id=after_id):
+        for registration in batch:
+            if send_event_reminder(registration.attendee, registration.event):
+                sent += 1
+        run.renew(cursor=f'{tomorrow}:{batch[-1].id}')
+
+    run.cursor = tomorrow
+    return f'{sent} reminder(s) for {tomorrow}'
+
+@scheduled_job('dedupe-registrations', interval=timedelta(hours=1))
+def dedupe_registrations(run):
+    """Remove duplicate registrations left by concurrent sync-mode requests,
+    keeping the earliest one per attendee and event. Works one batch of
+    events per transaction so the live table is never locked for long."""
+    removed = 0
+    for batch in iter_batches(Event.query.options(db.load_only(Event.id))):
+        run.renew()
+        event_ids = [event.id for event in batch]
+        keep = db.select(db.func.min(Registration.id)).where(
+            Registration.event_id.in_(event_ids)
+        ).group_by(Registration.event_id, Registration.attendee_id)
+        removed += db.session.execute(
+            db.delete(Registration).where(
+                Registration.event_id.in_(event_ids),
+                Registration.id.not_in(keep)
+            )
+        ).rowcount
+        db.session.commit()
+    return f'{removed} duplicate(s) removed'
+
+@scheduled_job('archive-past-events', interval=timedelta(days=1))
+def archive_past_events_job(run):
+    return f'{archive_past_events(on_batch=run.renew)} event(s) archived'
+
+if app.config['JOB_SCHEDULER_ENABLED']:
+    start_job_scheduler()
+
 # Routes
 @app.route('/')
 def home():
@@ -238,7 +970,7 @@ def home():
     recent_events = Event.query.order_by(Event.created_at.desc()).limit(3).all()
     
     return render_template('index.html', 
-                         events=recent_events,
+                         events=present_events(recent_events, summary_length=100),
                          events_count=events_count,
                          users_count=users_count,
                          organizers_count=organizers_count)
@@ -300,11 +1032,19 @@ def search_events():
         events_query = events_query.order_by(Event.created_at.desc())
     
     events = events_query.all()
-    
-    return render_template('events.html', 
-                         events=events, 
-                         form=form,
-                         search_params=search_params)
+    search_params = {
+        'query': query,
+        'category': category,
+        'date_from': date_from,
+        'date_to': date_to,
+        'venue': venue,
+        'sort_by': sort_by
+    }
+    
+    return render_event_list('events.html', 
+                             present_events(events), 
+                             form=form,
+                             search_params=search_params)
 
 # Registration route
 @app.route('/register', methods=['GET', 'POST'])
@@ -326,7 +1066,11 @@ def register():
             whatsapp=form.whatsapp.data,
             role=form.role.data
         )
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except PasswordHashBusy:
+            flash('We are handling a lot of sign-ups right now. Please try again in a moment.', 'error')
+            return render_template('register.html', form=form), 503
         
         # Add to database
         db.session.add(user)
@@ -344,8 +1088,22 @@ def login():
     
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        
-        if user and user.check_password(form.password.data):
+
+        try:
+            password_ok = user is not None and user.check_password(form.password.data)
+        except PasswordHashBusy:
+            flash('We are handling a lot of sign-ins right now. Please try again in a moment.', 'error')
+            return render_template('login.html', form=form), 503
+
+        if password_ok and user.needs_rehash():
+            # Upgrade to the current hash parameters while we have the password
+            try:
+                user.set_password(form.password.data)
+                db.session.commit()
+            except PasswordHashBusy:
+                pass  # Keep the old hash; we'll try again on the next login
+
+        if password_ok:
             login_user(user)
             flash(f'Welcome back, {user.username}!', 'success')
             return redirect(url_for('home'))
@@ -375,10 +1133,10 @@ def events():
     events_list = Event.query.order_by(Event.date.asc()).all()
     
     # Pass empty search_params for the main events page
-    return render_template('events.html', 
-                         events=events_list, 
-                         form=form, 
-                         search_params={})
+    return render_event_list('events.html', 
+                             present_events(events_list), 
+                             form=form, 
+                             search_params={})
 
 @app.route('/events/create', methods=['GET', 'POST'])
 @login_required
@@ -518,19 +1276,20 @@ def delete_event(event_id):
         flash('You can only delete your own events.', 'error')
         return redirect(url_for('event_detail', event_id=event_id))
     
-    # Delete associated registrations first
-    Registration.query.filter_by(event_id=event_id).delete()
-    db.session.delete(event)
-    db.session.commit()
-    
+    # Soft-delete: move the event and its registrations to the archive tables
+    archive_events([event_id], reason='deleted')
+
     flash('Event deleted successfully!', 'success')
     return redirect(url_for('events'))
 
 @app.route('/events/<int:event_id>/register')
 @login_required
 def register_event(event_id):
+    if app.config['REGISTRATION_MODE'] == 'queued':
+        return register_event_queued(event_id)
+
     event = Event.query.get_or_404(event_id)
-    
+
     if current_user.id == event.organizer_id:
         flash('You are the organizer of this event - no need to register!', 'warning')
         return redirect(url_for('event_detail', event_id=event_id))
@@ -559,6 +1318,52 @@ def register_event(event_id):
     flash('Successfully registered for the event! Check your email for confirmation.', 'success')
     return redirect(url_for('event_detail', event_id=event_id))
 
+def wants_json():
+    return request.accept_mimetypes.best == 'application/json'
+
+def register_event_queued(event_id):
+    # Only a primary-key lookup on the request thread, so unknown ids can't
+    # spin up consumers; the event's consumer does the real checks
+    if db.session.get(Event, event_id) is None:
+        abort(404)
+
+    try:
+        ticket = registration_queue.submit(event_id, current_user.id)
+    except RegistrationQueueFull:
+        message, category = REGISTRATION_OUTCOMES['busy']
+        if wants_json():
+            return jsonify({'event_id': event_id, 'status': 'busy', 'message': message}), 503
+        flash(message, category)
+        return redirect(url_for('event_detail', event_id=event_id))
+
+    if wants_json():
+        response = ticket.to_dict()
+        response['status_url'] = url_for('registration_status', ticket_id=ticket.id)
+        return jsonify(response), 202
+
+    # Browsers wait briefly for the outcome so the usual flash message appears
+    ticket.done.wait(app.config['REGISTRATION_WAIT_SECONDS'])
+    message, category = REGISTRATION_OUTCOMES[ticket.status]
+    flash(message, category)
+    return redirect(url_for('event_detail', event_id=event_id))
+
+# Route to poll a queued registration
+@app.route('/registrations/<ticket_id>')
+@login_required
+def registration_status(ticket_id):
+    ticket = registration_queue.get_ticket(ticket_id)
+    if ticket is None or ticket.attendee_id != current_user.id:
+        abort(404)
+
+    if wants_json():
+        response = ticket.to_dict()
+        response['message'] = REGISTRATION_OUTCOMES[ticket.status][0]
+        return jsonify(response)
+
+    message, category = REGISTRATION_OUTCOMES[ticket.status]
+    flash(message, category)
+    return redirect(url_for('event_detail', event_id=ticket.event_id))
+
 # Route to view event attendees
 @app.route('/events/<int:event_id>/attendees')
 @login_required
@@ -614,32 +1419,50 @@ def event_analytics(event_id):
         flash('You can only view analytics for your own events.', 'error')
         return redirect(url_for('event_detail', event_id=event_id))
     
+    registrations = Registration.query.filter_by(event_id=event_id)
+    return render_event_analytics(event, Registration, registrations, event_id=event_id)
+
+# Route for analytics of an archived (past or deleted) event
+@app.route('/archive/<int:archived_id>/analytics')
+@login_required
+def archived_event_analytics(archived_id):
+    event = ArchivedEvent.query.get_or_404(archived_id)
+
+    if event.organizer_id != current_user.id:
+        flash('You can only view analytics for your own events.', 'error')
+        return redirect(url_for('my_events'))
+
+    registrations = ArchivedRegistration.query.filter_by(archived_event_id=archived_id)
+    return render_event_analytics(event, ArchivedRegistration, registrations,
+                                  event_id=event.event_id, is_archived=True)
+
+def render_event_analytics(event, registration_model, registrations_query, event_id, is_archived=False):
     # Calculate analytics
-    total_registrations = Registration.query.filter_by(event_id=event_id).count()
-    
+    total_registrations = registrations_query.count()
+
     # Registration trend (last 7 days)
-    from datetime import datetime, timedelta
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    
-    recent_registrations = Registration.query.filter(
-        Registration.event_id == event_id,
-        Registration.registered_at >= seven_days_ago
+
+    recent_registrations = registrations_query.filter(
+        registration_model.registered_at >= seven_days_ago
     ).count()
-    
+
     # Capacity utilization
     capacity_utilization = 0
     if event.capacity > 0:
         capacity_utilization = (total_registrations / event.capacity) * 100
-    
+
     # Get attendee list for details
-    registrations = Registration.query.filter_by(event_id=event_id).all()
-    
+    registrations = registrations_query.all()
+
     return render_template('event_analytics.html',
                          event=event,
+                         event_id=event_id,
+                         is_archived=is_archived,
                          total_registrations=total_registrations,
                          recent_registrations=recent_registrations,
                          capacity_utilization=capacity_utilization,
-                         registrations=registrations)    
+                         registrations=registrations)
 
 @app.route('/my-events')
 @login_required
@@ -647,12 +1470,71 @@ def my_events():
     if current_user.role == 'organizer':
         # Show events created by organizer
         events = Event.query.filter_by(organizer_id=current_user.id).all()
-        return render_template('my_events.html', events=events, user_role='organizer')
+        archived_events = ArchivedEvent.query.filter_by(
+            organizer_id=current_user.id
+        ).order_by(ArchivedEvent.date.desc()).all()
+        return render_event_list('my_events.html', present_events(events),
+                                 archived_events=archived_events, user_role='organizer')
     else:
-        # Show events attended by user
-        registrations = Registration.query.filter_by(attendee_id=current_user.id).all()
-        events = [reg.event for reg in registrations]
-        return render_template('my_events.html', events=events, user_role='attendee')
+        # Show events attended by user (one joined query, not one per registration)
+        events = Event.query.join(Registration).filter(
+            Registration.attendee_id == current_user.id
+        ).order_by(Registration.registered_at).all()
+        archived_events = ArchivedEvent.query.join(
+            ArchivedRegistration,
+            ArchivedRegistration.archived_event_id == ArchivedEvent.id
+        ).filter(
+            ArchivedRegistration.attendee_id == current_user.id
+        ).order_by(ArchivedEvent.date.desc()).all()
+        return render_event_list('my_events.html', present_events(events),
+                                 archived_events=archived_events, user_role='attendee')
+
+# CLI commands
+@app.cli.command('archive-events')
+@click.option('--days', default=0, help='Only archive events older than this many days.')
+@click.option('--batch-size', default=None, type=int, help='Events moved per transaction.')
+def archive_events_command(days, batch_size):
+    """Move past events and their registrations into the archive tables."""
+    before = datetime.utcnow().date() - timedelta(days=days)
+    archived = archive_past_events(before=before, batch_size=batch_size)
+    click.echo(f'Archived {archived} event(s) dated before {before.isoformat()}.')
+
+@app.cli.group('jobs')
+def jobs_cli():
+    """Run and inspect scheduled background jobs."""
+
+@jobs_cli.command('list')
+def jobs_list_command():
+    """Show every job with its schedule and last result."""
+    sync_jobs()
+    for job in Job.query.order_by(Job.name):
+        lease = f', leased by {job.lease_owner}' if job.lease_owner else ''
+        click.echo(f'{job.name}: next {job.next_run_at:%Y-%m-%d %H:%M}, '
+                   f'last {job.last_status or "never run"} ({job.last_result or "-"}){lease}')
+
+@jobs_cli.command('run')
+@click.argument('name', type=click.Choice(sorted(JOBS)))
+@click.option('--force', is_flag=True, help='Run even if the job is not due yet.')
+def jobs_run_command(name, force):
+    """Run a single job now."""
+    sync_jobs()
+    result = run_job(name, force=force)
+    if result is None:
+        click.echo(f'{name}: skipped (not due, leased by another worker, or failed)')
+    else:
+        click.echo(f'{name}: {result}')
+
+@jobs_cli.command('run-due')
+def jobs_run_due_command():
+    """Run every job that is due (suitable for cron)."""
+    for name, result in run_due_jobs().items():
+        click.echo(f'{name}: {result}')
+
+@jobs_cli.command('worker')
+def jobs_worker_command():
+    """Poll for due jobs forever, every JOB_POLL_SECONDS."""
+    click.echo(f'Job worker {worker_id()} started.')
+    job_scheduler_loop()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
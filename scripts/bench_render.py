@@ -0,0 +1,67 @@
+"""Benchmark rendering of the /events page with a large event list.
+
+Seeds a throwaway SQLite database with 500 events and 20,000 registrations
+and times GET /events through the Flask test client.
+
+    python scripts/bench_render.py [--events 500] [--registrations 20000] [--runs 20]
+
+To compare with the pre-presenter templates, run the same script from a
+checkout of an older commit (it only relies on the models and routes).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--registrations', type=int, default=20000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-render-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ['TEMPLATE_CACHE_DIR'] = os.path.join(workdir, 'jinja_cache')
+    sys.path.insert(0, ROOT)
+    from app import app, db, datetime, User, Event, Registration
+
+    organizers, attendees = 20, 2000
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.bulk_insert_mappings(User, [
+            dict(id=i, username=f'user{i}', email=f'user{i}@example.com', password_hash='x',
+                 role='organizer' if i <= organizers else 'attendee')
+            for i in range(1, organizers + attendees + 1)
+        ])
+        db.session.bulk_insert_mappings(Event, [
+            dict(id=i, title=f'Event {i}', description='lorem ipsum ' * 30, category='workshop',
+                 date='2099-01-%02d' % (i % 28 + 1), time='10:00', venue='Nairobi', capacity=100,
+                 organizer_id=i % organizers + 1, created_at=datetime.utcnow())
+            for i in range(1, args.events + 1)
+        ])
+        db.session.bulk_insert_mappings(Registration, [
+            dict(event_id=i % args.events + 1, attendee_id=organizers + 1 + i % attendees)
+            for i in range(args.registrations)
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    client.get('/events')  # warm-up: template load, connection pool
+
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        body = client.get('/events').data
+    elapsed = (time.perf_counter() - started) / args.runs
+
+    print(f'/events with {args.events} events, {args.registrations} registrations: '
+          f'{elapsed * 1000:.1f} ms/page over {args.runs} runs ({len(body)} bytes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Load test for the queued registration mode (REGISTRATION_MODE=queued).
+
+Seeds a throwaway SQLite database with one event and many attendees, then:
+
+1. fires JSON registration requests at /events/<id>/register from many
+   threads (including duplicate requests) and waits for every ticket;
+2. submits tickets straight to the admission queue, bypassing HTTP.
+
+The end-to-end HTTP rate is the throughput result and is checked against
+--target (1000 req/s by default). The admission-queue rate is only a
+diagnostic for the queue on its own. The script exits non-zero if the event
+ended up with more registrations than its capacity.
+
+    python scripts/load_test_registration.py [--attendees 5000] [--capacity 1000] [--threads 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(app, db, User, Event, attendees, capacity):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        organizer = User(username='organizer', email='organizer@example.com',
+                         role='organizer', password_hash='x')
+        db.session.add(organizer)
+        db.session.commit()
+        db.session.bulk_insert_mappings(User, [
+            dict(username=f'attendee{i}', email=f'attendee{i}@example.com', password_hash='x')
+            for i in range(attendees)
+        ])
+        event = Event(title='Flash sale', description='Load test', category='social',
+                      date='2099-01-01', time='10:00', venue='Nairobi', capacity=capacity,
+                      organizer_id=organizer.id)
+        db.session.add(event)
+        db.session.commit()
+        attendee_ids = db.session.scalars(
+            db.select(User.id).where(User.role == 'attendee').order_by(User.id)).all()
+        return event.id, attendee_ids
+
+
+def check_capacity(app, db, Registration, event_id, capacity):
+    with app.app_context():
+        total = Registration.query.filter_by(event_id=event_id).count()
+        distinct = db.session.scalar(
+            db.select(db.func.count(db.distinct(Registration.attendee_id)))
+            .where(Registration.event_id == event_id))
+    ok = total <= capacity and total == distinct
+    print(f'  registrations: {total} (distinct attendees {distinct}, capacity {capacity}) '
+          f'-> {"OK" if ok else "OVERBOOKED"}')
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attendees', type=int, default=5000)
+    parser.add_argument('--capacity', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duplicates', type=int, default=10,
+                        help='Extra repeat requests per thread')
+    parser.add_argument('--target', type=int, default=1000,
+                        help='End-to-end HTTP throughput target in req/s')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='load-test-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'load.db')
+    os.environ['TEMPLATE_CACHE_DIR'] = os.path.join(workdir, 'jinja_cache')
+    os.environ['REGISTRATION_MODE'] = 'queued'
+    sys.path.insert(0, ROOT)
+    from app import app, db, mail, registration_queue, User, Event, Registration
+    from flask_login.utils import _create_identifier
+
+    app.config['MAIL_SUPPRESS_SEND'] = True
+    mail.init_app(app)
+    serializer = app.session_interface.get_signing_serializer(app)
+    # Flask-Login's session-protection id for the test client's address and
+    # user agent; without it every response would rewrite the session cookie
+    with app.test_request_context(environ_base=app.test_client().environ_base):
+        session_id = _create_identifier()
+    ok = True
+
+    # Phase 1: end-to-end through the HTTP handler
+    event_id, attendee_ids = seed(app, db, User, Event, args.attendees, args.capacity)
+    cookies = {uid: serializer.dumps({'_user_id': str(uid), '_fresh': True, '_id': session_id})
+               for uid in attendee_ids}
+    url = f'/events/{event_id}/register'
+    ticket_ids = []
+
+    def worker(chunk):
+        client = app.test_client(use_cookies=False)
+        for uid in chunk:
+            response = client.get(url, headers={'Accept': 'application/json',
+                                                'Cookie': f'session={cookies[uid]}'})
+            ticket_ids.append(response.get_json()['ticket'])
+
+    chunks = [attendee_ids[i::args.threads] for i in range(args.threads)]
+    threads = [threading.Thread(target=worker, args=(chunk + chunk[:args.duplicates],))
+               for chunk in chunks]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    accepted = time.perf_counter() - started
+    tickets = [registration_queue.get_ticket(ticket_id) for ticket_id in ticket_ids]
+    for ticket in tickets:
+        ticket.done.wait(60)
+    finished = time.perf_counter() - started
+
+    print(f'HTTP: {len(tickets)} requests from {args.threads} threads')
+    print(f'  accepted in {accepted:.2f}s ({len(tickets) / accepted:.0f} req/s), '
+          f'all resolved in {finished:.2f}s ({len(tickets) / finished:.0f} req/s)')
+    print(f'  outcomes: {dict(Counter(ticket.status for ticket in tickets))}')
+    http_rate = len(tickets) / finished
+    print(f'  end-to-end target {args.target} req/s: '
+          f'{"MET" if http_rate >= args.target else "NOT MET"} ({http_rate:.0f} req/s)')
+    ok &= check_capacity(app, db, Registration, event_id, args.capacity)
+
+    # Phase 2: admission queue alone
+    event_id, attendee_ids = seed(app, db, User, Event, args.attendees, args.capacity)
+    started = time.perf_counter()
+    tickets = [registration_queue.submit(event_id, uid) for uid in attendee_ids]
+    for ticket in tickets:
+        ticket.done.wait(60)
+    finished = time.perf_counter() - started
+
+    print(f'Admission queue only (no HTTP, diagnostic): {len(tickets)} tickets in {finished:.2f}s '
+          f'({len(tickets) / finished:.0f} req/s)')
+    print(f'  outcomes: {dict(Counter(ticket.status for ticket in tickets))}')
+    ok &= check_capacity(app, db, Registration, event_id, args.capacity)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()